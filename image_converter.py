@@ -13,8 +13,50 @@
 
 import cv2
 import numpy as np
+import array
+import concurrent.futures
+import ctypes
+import functools
+import threading
 import time
 import os
+from typing import Optional
+
+# Numba is optional: without it the JIT-compiled method is simply skipped.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = prange = None
+
+# CuPy is optional as well, and only used when a CUDA device is present.
+try:
+    import cupy as cp
+    if cp.cuda.runtime.getDeviceCount() == 0:
+        cp = None
+except (ImportError, RuntimeError):
+    cp = None
+
+# The native kernels are optional too: without `make -C native` the
+# hand-written SIMD method is simply skipped.
+try:
+    _native_lib = np.ctypeslib.load_library(
+        "libgray", os.path.join(os.path.dirname(os.path.abspath(__file__)), "native"))
+    for _name in ("bgr2gray", "bgra2gray", "bgr2gray_q8", "bgra2gray_q8"):
+        getattr(_native_lib, _name).argtypes = [
+            np.ctypeslib.ndpointer(dtype=np.uint8, flags="C_CONTIGUOUS"),
+            np.ctypeslib.ndpointer(dtype=np.uint8, flags="C_CONTIGUOUS"),
+            ctypes.c_size_t,
+        ]
+        getattr(_native_lib, _name).restype = None
+    _native_lib.gray_isa.restype = ctypes.c_char_p
+except OSError:
+    _native_lib = None
+
+# Luminosity coefficients for the B, G and R channels in 8.8 fixed point
+# (0.114, 0.587 and 0.299 multiplied by 256, rounded to the nearest integer),
+# shared by the integer methods. They add up to exactly 256, so pure white
+# stays at 255.
+Q8_COEFFICIENTS = (29, 150, 77)
 
 # --- METHOD 1: The Slow, Non-Idiomatic Approach (For-Loops) ---
 
@@ -34,34 +76,110 @@ def convert_to_grayscale_loop(image: np.ndarray) -> np.ndarray:
     Returns:
         np.ndarray: The resulting grayscale image as a 2D NumPy array.
     """
+    # The byte-string split below reads one byte per channel value, so the
+    # pixels must really be uint8: a uint16 image would be read as pairs of
+    # bytes. Convert up front, the same way the SIMD method does.
+    image = np.asarray(image, dtype=np.uint8)
+
     # Get the dimensions of the image.
-    height, width, _ = image.shape
+    height, width, channels = image.shape
+    blue_coeff, green_coeff, red_coeff = Q8_COEFFICIENTS
+    
+    # Split the image into one flat byte string per color channel before the
+    # loop. Indexing a byte string returns a plain Python int, which is much
+    # cheaper than `image[i, j]`: that builds a new NumPy array for every pixel
+    # just to unpack it into three numbers.
+    # OpenCV loads images in BGR order by default, not RGB.
+    pixels = image.tobytes()
+    blues = pixels[0::channels]
+    greens = pixels[1::channels]
+    reds = pixels[2::channels]
     
-    # Create an empty, black image with the same height and width.
-    # This array will be filled with the calculated grayscale values.
-    grayscale_image = np.zeros((height, width), dtype=np.uint8)
+    # Create an empty, black image with the same number of pixels.
+    # This byte array will be filled with the calculated grayscale values.
+    grayscale_image = array.array('B', bytes(height * width))
     
+    # `index` walks over the pixels in order, so no positions have to be
+    # computed from (i, j) inside the loop.
+    index = 0
     # Iterate over each row (y-coordinate).
     for i in range(height):
         # Iterate over each column in the current row (x-coordinate).
         for j in range(width):
             # Extract the Blue, Green, and Red channel values for the current pixel.
-            # OpenCV loads images in BGR order by default, not RGB.
-            blue, green, red = image[i, j]
+            blue = blues[index]
+            green = greens[index]
+            red = reds[index]
             
             # Apply the standard luminosity formula to calculate the grayscale value.
             # Formula: Y = 0.299*R + 0.587*G + 0.114*B
             # These coefficients account for the human eye's varying sensitivity to colors.
-            gray_value = int(0.114 * blue + 0.587 * green + 0.299 * red)
+            # Like the vectorized method, it uses the 8.8 fixed-point coefficients,
+            # so it stays in integer arithmetic and gives identical results.
+            gray_value = (blue_coeff * blue + green_coeff * green + red_coeff * red) >> 8
             
             # Assign the calculated grayscale value to the corresponding pixel in the output image.
-            grayscale_image[i, j] = gray_value
+            grayscale_image[index] = gray_value
+            index += 1
             
-    return grayscale_image
+    # Wrap the filled bytes as a 2D NumPy array (no copy is made).
+    return np.frombuffer(grayscale_image, dtype=np.uint8).reshape(height, width)
 
 # --- METHOD 2: The Fast, Idiomatic Python Approach (Vectorization) ---
 
-def convert_to_grayscale_vectorized(image: np.ndarray) -> np.ndarray:
+# Every thread keeps one pair of work arrays here, so concurrent callers never
+# share a buffer, and the arrays go away together with their thread.
+_scratch = threading.local()
+
+def _scratch_buffers(height: int, width: int) -> tuple:
+    """
+    Returns this thread's pair of reusable uint16 work arrays, resized to the
+    given height and width.
+
+    Only the most recent shape is kept: a call with a new shape replaces the
+    pair, so memory for earlier image sizes is freed instead of piling up.
+    """
+    if getattr(_scratch, "shape", None) != (height, width):
+        _scratch.shape = (height, width)
+        _scratch.arrays = (np.empty((height, width), dtype=np.uint16),
+                           np.empty((height, width), dtype=np.uint16))
+    return _scratch.arrays
+
+def _luminosity_q8(image: np.ndarray, out: np.ndarray,
+                   accumulator: np.ndarray, scratch: np.ndarray) -> None:
+    """
+    Writes the fixed-point luminosity of `image` into `out`, using the two
+    given uint16 arrays (same height and width as `out`) as work space.
+    """
+    # The coefficients for the B, G and R channels of the luminosity formula are
+    # stored as 8.8 fixed-point integers (0.114 * 256 ~= 29, 0.587 * 256 ~= 150,
+    # 0.299 * 256 ~= 77). This keeps the whole computation in integers: a float64
+    # version would first blow the uint8 image up to 8 bytes per channel, and
+    # this task is limited by memory traffic, not arithmetic.
+    # The coefficients add up to 256, so the largest possible sum is 255 * 256 =
+    # 65280. That fits in a uint16, so the intermediate takes only 2 bytes per
+    # pixel, a quarter of the 8 bytes per pixel of a float64 intermediate.
+    blue_coeff, green_coeff, red_coeff = Q8_COEFFICIENTS
+    
+    # This is the core of vectorization.
+    # Each line below is a single NumPy call that processes every pixel of one
+    # channel at once, which is thousands of times faster than iterating pixel
+    # by pixel. Indexing channels 0, 1 and 2 ignores a potential alpha channel.
+    # There is no np.ascontiguousarray() guard here on purpose: the ufuncs walk
+    # strided views (e.g. image[..., ::-1] or a transposed image) directly, and
+    # making a contiguous copy first was measured to be slower.
+    np.multiply(image[..., 0], blue_coeff, out=accumulator, dtype=np.uint16)
+    np.multiply(image[..., 1], green_coeff, out=scratch, dtype=np.uint16)
+    np.add(accumulator, scratch, out=accumulator)
+    np.multiply(image[..., 2], red_coeff, out=scratch, dtype=np.uint16)
+    np.add(accumulator, scratch, out=accumulator)
+    
+    # Shifting right by 8 bits divides by 256 and undoes the fixed-point scaling.
+    # The result fits in 0-255, so it is written straight into an 8-bit unsigned
+    # integer array, which is the standard format for image pixels.
+    np.right_shift(accumulator, 8, out=out, casting='unsafe')
+
+def convert_to_grayscale_vectorized(image: np.ndarray, out: np.ndarray = None) -> np.ndarray:
     """
     Converts a color image to grayscale using NumPy's vectorized operations.
 
@@ -72,27 +190,326 @@ def convert_to_grayscale_vectorized(image: np.ndarray) -> np.ndarray:
 
     Args:
         image (np.ndarray): The input color image (BGR format).
+        out (np.ndarray, optional): A uint8 array of shape (height, width) to
+                                    write the result into, e.g. one buffer that
+                                    is reused for every frame of a video.
+
+    Returns:
+        np.ndarray: The resulting grayscale image (`out`, if it was given).
+                    A newly allocated result is a C-contiguous uint8 array
+                    whatever the memory layout of the input. Downstream code
+                    such as cv2.imwrite or a neural network only takes its
+                    fast path on contiguous input.
+
+    Raises:
+        ValueError: If `out` does not have the image's height and width, or
+                    is not a uint8 array.
+    """
+    height, width = image.shape[:2]
+    if out is not None and (out.shape != (height, width) or out.dtype != np.uint8):
+        raise ValueError(f"'out' must be a uint8 array of shape {(height, width)}, "
+                         f"not a {out.dtype} array of shape {out.shape}.")
+    
+    # The intermediate sums are written into scratch buffers that are allocated
+    # once and reused on every later call with the same image shape (e.g. for
+    # every frame of a video), instead of creating fresh temporaries each time.
+    accumulator, scratch = _scratch_buffers(height, width)
+    
+    # Without `out`, the result is written into a freshly allocated array, so it
+    # is always contiguous, even for a sliced or transposed input image.
+    if out is None:
+        out = np.empty((height, width), dtype=np.uint8)
+    _luminosity_q8(image, out, accumulator, scratch)
+    return out
+
+# --- METHOD 3: The Compiled Approach (Numba JIT) ---
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True, boundscheck=False)
+    def _gray_kernel(image, out):
+        # The exact same loop body as METHOD 1, but compiled to machine code by
+        # LLVM. `prange` spreads the rows over all cores and the inner column
+        # loop is auto-vectorized (SIMD).
+        # The kernel is deliberately generic in the image size. Compiling one
+        # specialized version per (height, width), with the loop bounds baked
+        # in as constants, was measured to give no speedup: the loop is limited
+        # by memory bandwidth, not loop control, and every new shape would pay
+        # a fresh compilation of ~0.5 seconds.
+        for i in prange(image.shape[0]):
+            for j in range(image.shape[1]):
+                blue = image[i, j, 0]
+                green = image[i, j, 1]
+                red = image[i, j, 2]
+                out[i, j] = (Q8_COEFFICIENTS[0] * blue + Q8_COEFFICIENTS[1] * green
+                             + Q8_COEFFICIENTS[2] * red) >> 8
+
+def convert_to_grayscale_numba(image: np.ndarray) -> np.ndarray:
+    """
+    Converts a color image to grayscale using the same nested loops as
+    METHOD 1, JIT-compiled with Numba.
+
+    This shows that loops themselves are not the problem - the Python
+    interpreter is. Once the loop is compiled there is no per-pixel overhead
+    left, and the work is split across CPU cores.
+
+    Args:
+        image (np.ndarray): The input color image (BGR format).
+
+    Returns:
+        np.ndarray: The resulting grayscale image.
+
+    Raises:
+        RuntimeError: If Numba is not installed.
+    """
+    if njit is None:
+        raise RuntimeError("Numba is not installed. Run 'pip install numba'.")
+
+    height, width = image.shape[:2]
+    grayscale_image = np.empty((height, width), dtype=np.uint8)
+    _gray_kernel(image, grayscale_image)
+    return grayscale_image
+
+# --- METHOD 4: The Tuned Library Approach (OpenCV) ---
+
+def convert_to_grayscale_cv(image: np.ndarray) -> np.ndarray:
+    """
+    Converts a color image to grayscale using OpenCV's `cvtColor`.
+
+    OpenCV ships a hand-written SIMD (SSE2/AVX2/NEON) kernel for exactly this
+    conversion. It works directly on the 8-bit pixels, with no temporary
+    arrays, which is why it is the one to use in production code.
+
+    Args:
+        image (np.ndarray): The input color image (BGR or BGRA format).
 
     Returns:
         np.ndarray: The resulting grayscale image.
     """
-    # Define the coefficients for the BGR channels for the luminosity formula.
-    # Note the order matches OpenCV's BGR format: [Blue_Coeff, Green_Coeff, Red_Coeff]
-    coefficients = np.array([0.114, 0.587, 0.299])
+    if image.shape[-1] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+# --- METHOD 5: The Hand-Written SIMD Approach (Intrinsics) ---
+
+def native_isa() -> Optional[str]:
+    """
+    Returns the name of the instruction set (e.g. "AVX2") that the native
+    kernels of METHOD 5 picked for this CPU, or None if they are not built.
+    """
+    return _native_lib.gray_isa().decode() if _native_lib is not None else None
+
+def convert_to_grayscale_simd(image: np.ndarray, exact: bool = False) -> np.ndarray:
+    """
+    Converts a color image to grayscale using the hand-written SIMD kernels in
+    `native/`.
+
+    This is the lowest rung of the ladder: the VPMADDUBSW instruction multiplies
+    32 bytes of pixels by their weights and adds them in pairs in a single
+    step. That instruction needs signed 8-bit weights, so they are stored
+    as 1.7 fixed point, which is coarser than the 8.8 weights of METHOD 2:
+    on random input about a third of the pixels come out one gray level
+    above or below the NumPy result. Black, white and every pure gray still
+    map to themselves. The library contains
+    SSE4.2, AVX2 and AVX-512 versions of the kernels and uses the fastest one
+    the CPU supports (see `native_isa()`).
+
+    Args:
+        image (np.ndarray): The input color image (BGR or BGRA format).
+        exact (bool, optional): Use the VPMADDWD kernels instead, which widen
+                                the pixels to 16 bits so that they can use the
+                                8.8 weights of METHOD 2. They are a little
+                                slower, but give the same value as METHOD 2
+                                for every pixel. They require AVX2; older CPUs
+                                fall back to plain C code.
+
+    Returns:
+        np.ndarray: The resulting grayscale image.
+
+    Raises:
+        RuntimeError: If the native library has not been built.
+        ValueError: If the image does not have 3 or 4 channels.
+    """
+    if _native_lib is None:
+        raise RuntimeError("The native library is not built. Run 'make -C native'.")
+    # The kernels read exactly 3 or 4 bytes per pixel, so any other layout
+    # would make them read past the end of the image.
+    if image.ndim != 3 or image.shape[2] not in (3, 4):
+        raise ValueError(f"Expected an image of shape (height, width, 3 or 4), "
+                         f"not {image.shape}.")
+
+    # The kernels read tightly packed BGR or BGRA bytes. A BGRA image gets its
+    # own kernel that skips the alpha byte itself: slicing it off with
+    # image[..., :3] would force a full copy of the image first.
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width, channels = image.shape
+    grayscale_image = np.empty((height, width), dtype=np.uint8)
+    # NumPy gives empty arrays zero strides, and there is nothing to convert.
+    if image.size == 0:
+        return grayscale_image
+    assert image.strides[-1] == image.itemsize
+    if exact:
+        kernel = _native_lib.bgra2gray_q8 if channels == 4 else _native_lib.bgr2gray_q8
+    else:
+        kernel = _native_lib.bgra2gray if channels == 4 else _native_lib.bgr2gray
     
-    # This is the core of vectorization.
-    # We perform a dot product between the image's pixel values and the coefficients.
-    # NumPy applies this operation across the entire image simultaneously, which is
-    # thousands of times faster than iterating pixel by pixel.
-    # image[..., :3] ensures we only use the B, G, R channels, ignoring a potential alpha channel.
-    grayscale_image = np.dot(image[..., :3], coefficients)
+    kernel(image, grayscale_image, height * width)
+    return grayscale_image
+
+# --- METHOD 6: Vectorization on Every Core (Multithreading) ---
+
+@functools.lru_cache(maxsize=1)
+def _thread_pool() -> concurrent.futures.ThreadPoolExecutor:
+    """
+    Returns the one thread pool shared by METHODS 6 and 7, with one worker per
+    CPU core, so threads are not restarted on every call. Callers cap their
+    own concurrency by how many tasks they submit, so a different `n_threads`
+    never needs a new pool.
+    """
+    return concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
+def convert_to_grayscale_threaded(image: np.ndarray, n_threads: int = None) -> np.ndarray:
+    """
+    Converts a color image to grayscale by running the vectorized method of
+    METHOD 2 on horizontal stripes of the image in parallel.
+
+    A single NumPy call only ever uses one CPU core. Every output row depends
+    only on the same input row, so the image can be split into stripes that
+    are processed on different cores at the same time. NumPy releases the GIL
+    inside its compiled loops, so plain Python threads are enough.
+
+    Args:
+        image (np.ndarray): The input color image (BGR format).
+        n_threads (int, optional): The number of stripes (at most one per
+                                   row), and so of threads working at once,
+                                   up to one per CPU core. Defaults to the
+                                   number of CPU cores.
+
+    Returns:
+        np.ndarray: The resulting grayscale image.
+    """
+    height, width = image.shape[:2]
+    n_threads = max(1, n_threads or os.cpu_count() or 1)
+    # Every stripe is one task, so no more than `n_stripes` threads of the
+    # shared pool ever work on this image at the same time.
+    n_stripes = max(1, min(n_threads, height))
+    
+    # Every stripe writes into its own slice of the shared output and work
+    # arrays, so no stripe results have to be copied or concatenated afterwards.
+    accumulator, scratch = _scratch_buffers(height, width)
+    grayscale_image = np.empty((height, width), dtype=np.uint8)
+    
+    bounds = np.linspace(0, height, n_stripes + 1).astype(int)
+    pool = _thread_pool()
+    futures = [
+        pool.submit(_luminosity_q8, image[i0:i1], grayscale_image[i0:i1],
+                    accumulator[i0:i1], scratch[i0:i1])
+        for i0, i1 in zip(bounds[:-1], bounds[1:])
+    ]
+    for future in futures:
+        future.result()
+    return grayscale_image
+
+# --- METHOD 7: Cache-Friendly Tiles (Cache Blocking) ---
+
+def _convert_tile(image: np.ndarray, out: np.ndarray, tile: int) -> None:
+    """Converts one tile, using small work arrays that belong to this thread."""
+    height, width = image.shape[:2]
+    # Edge tiles are smaller, so they use the top-left corner of the full
+    # tile-sized arrays instead of replacing them with a new shape.
+    accumulator, scratch = _scratch_buffers(tile, tile)
+    _luminosity_q8(image, out, accumulator[:height, :width], scratch[:height, :width])
+
+def _convert_tiles(image: np.ndarray, out: np.ndarray, tile: int, corners: list) -> None:
+    """Converts the tiles with the given top-left corners, one after another."""
+    for i0, j0 in corners:
+        _convert_tile(image[i0:i0 + tile, j0:j0 + tile], out[i0:i0 + tile, j0:j0 + tile], tile)
+
+def convert_to_grayscale_tiled(image: np.ndarray, tile: int = 256,
+                               n_threads: int = None) -> np.ndarray:
+    """
+    Converts a color image to grayscale tile by tile, so the intermediate
+    sums never leave the CPU cache.
+
+    METHOD 2 processes the whole image in one pass per step: a large image
+    does not fit in the cache, so every step streams all of its data from
+    main memory and back. Working on small square tiles instead keeps the
+    tile and its work arrays in the fast L2 cache until the tile is done,
+    and only the input and the final result travel to and from RAM. The
+    tiles are spread over all CPU cores, as in METHOD 6.
+
+    Args:
+        image (np.ndarray): The input color image (BGR format).
+        tile (int, optional): The tile edge length in pixels. A 256x256 tile
+                              with its work arrays takes ~512 KB.
+        n_threads (int, optional): The number of threads working at once, up
+                                   to one per CPU core. Defaults to the
+                                   number of CPU cores.
+
+    Returns:
+        np.ndarray: The resulting grayscale image.
+    """
+    height, width = image.shape[:2]
+    n_threads = max(1, n_threads or os.cpu_count() or 1)
+    grayscale_image = np.empty((height, width), dtype=np.uint8)
     
-    # The result of the dot product is a float array. We must convert it back to
-    # an 8-bit unsigned integer, which is the standard format for image pixels (0-255).
-    return grayscale_image.astype(np.uint8)
+    # The tiles are dealt out round-robin into one batch per thread, so no
+    # more than `n_threads` threads of the shared pool work at the same time.
+    corners = [(i0, j0) for i0 in range(0, height, tile) for j0 in range(0, width, tile)]
+    n_batches = max(1, min(n_threads, len(corners)))
+    pool = _thread_pool()
+    futures = [
+        pool.submit(_convert_tiles, image, grayscale_image, tile, corners[k::n_batches])
+        for k in range(n_batches)
+    ]
+    for future in futures:
+        future.result()
+    return grayscale_image
+
+# --- METHOD 8: Moving the Work to the GPU (CuPy) ---
+
+if cp is not None:
+    # One CUDA thread per pixel, using the same fixed-point formula as METHOD 2.
+    _gray_cuda_kernel = cp.ElementwiseKernel(
+        "uint8 blue, uint8 green, uint8 red",
+        "uint8 gray",
+        "gray = ({} * blue + {} * green + {} * red) >> 8".format(*Q8_COEFFICIENTS),
+        "gray_cuda_kernel",
+    )
+
+def convert_to_grayscale_cuda(image):
+    """
+    Converts a color image to grayscale on an NVIDIA GPU using CuPy.
+
+    A GPU has far more memory bandwidth than a CPU, which is what this task
+    is limited by. For a NumPy input, though, the image has to be copied to
+    the GPU and the result copied back, which often costs more than the
+    conversion itself. The method shines when the image is already on the
+    GPU (e.g. in a deep learning pipeline): a CuPy array stays on the device.
+
+    Args:
+        image (np.ndarray or cupy.ndarray): The input color image (BGR format).
+
+    Returns:
+        np.ndarray or cupy.ndarray: The resulting grayscale image, on the same
+                                    device as the input.
+
+    Raises:
+        RuntimeError: If CuPy or a CUDA device is not available.
+    """
+    if cp is None:
+        raise RuntimeError("CuPy with a CUDA device is required. See https://cupy.dev.")
+
+    on_gpu = isinstance(image, cp.ndarray)
+    gpu_image = image if on_gpu else cp.asarray(image)
+    grayscale_image = _gray_cuda_kernel(
+        gpu_image[..., 0], gpu_image[..., 1], gpu_image[..., 2])
+    return grayscale_image if on_gpu else cp.asnumpy(grayscale_image)
 
 # --- MAIN EXECUTION BLOCK ---
 
+# The edge length of the crop that the slow loop is benchmarked on.
+LOOP_CROP_SIZE = 256
+
 def main():
     """
     The main entry point of the script. It loads an image, processes it
@@ -108,8 +525,14 @@ def main():
         print("Please make sure you have an 'images' folder with a 'sample.jpg' file inside.")
         return
 
-    # Read the image from disk using OpenCV.
+    # Read the image from disk using OpenCV. The first read of a file also pays
+    # for fetching it from disk, while the grayscale read further down finds it
+    # in the OS file cache. An untimed read first makes both decode timings
+    # start from a warm cache, so they measure only the decoding.
+    cv2.imread(image_path)
+    start_time_decode = time.perf_counter()
     color_image = cv2.imread(image_path)
+    time_decode = time.perf_counter() - start_time_decode
     if color_image is None:
         print(f"Error: Failed to read the image from '{image_path}'. It might be corrupted.")
         return
@@ -117,12 +540,18 @@ def main():
     print(f"Processing a {color_image.shape} image...\n")
 
     # --- Benchmark the Slow Method (For-Loops) ---
+    # The loop takes time proportional to the number of pixels, which can mean
+    # minutes for a large photo. It is therefore only timed on a small crop, and
+    # the time for the full image is extrapolated from that.
     print("[Slow Method] Using For-Loops:")
+    crop = color_image[:LOOP_CROP_SIZE, :LOOP_CROP_SIZE]
     start_time_loop = time.perf_counter()
-    grayscale_loop = convert_to_grayscale_loop(color_image)
+    grayscale_loop = convert_to_grayscale_loop(crop)
     end_time_loop = time.perf_counter()
-    time_loop = end_time_loop - start_time_loop
-    print(f"Time taken: {time_loop:.4f} seconds.")
+    time_crop = end_time_loop - start_time_loop
+    time_loop = time_crop * color_image[..., 0].size / crop[..., 0].size
+    print(f"Time taken: {time_crop:.4f} seconds for a {crop.shape[1]}x{crop.shape[0]} crop.")
+    print(f"Estimated time for the full image: {time_loop:.4f} seconds.")
     cv2.imwrite("grayscale_loop.jpg", grayscale_loop)
 
     # --- Benchmark the Fast Method (Vectorization) ---
@@ -134,6 +563,83 @@ def main():
     print(f"Time taken: {time_vec:.4f} seconds.")
     cv2.imwrite("grayscale_vectorized.jpg", grayscale_vec)
 
+    # --- Benchmark the Compiled Method (Numba JIT) ---
+    if njit is not None:
+        print("\n[Compiled Method] Using Numba JIT:")
+        # Run once on a single row first, so the one-time JIT compilation is
+        # not counted in the benchmark.
+        convert_to_grayscale_numba(color_image[:1])
+        start_time_numba = time.perf_counter()
+        grayscale_numba = convert_to_grayscale_numba(color_image)
+        end_time_numba = time.perf_counter()
+        time_numba = end_time_numba - start_time_numba
+        print(f"Time taken: {time_numba:.4f} seconds.")
+        cv2.imwrite("grayscale_numba.jpg", grayscale_numba)
+
+    # --- Benchmark the Tuned Library Method (OpenCV) ---
+    print("\n[Library Method] Using OpenCV cvtColor:")
+    start_time_cv = time.perf_counter()
+    grayscale_cv = convert_to_grayscale_cv(color_image)
+    end_time_cv = time.perf_counter()
+    time_cv = end_time_cv - start_time_cv
+    print(f"Time taken: {time_cv:.4f} seconds.")
+    cv2.imwrite("grayscale_cv.jpg", grayscale_cv)
+
+    # --- Benchmark the Hand-Written SIMD Method (Intrinsics) ---
+    if _native_lib is not None:
+        print(f"\n[SIMD Method] Using {native_isa()} Intrinsics:")
+        start_time_simd = time.perf_counter()
+        grayscale_simd = convert_to_grayscale_simd(color_image)
+        end_time_simd = time.perf_counter()
+        time_simd = end_time_simd - start_time_simd
+        print(f"Time taken: {time_simd:.4f} seconds.")
+        cv2.imwrite("grayscale_simd.jpg", grayscale_simd)
+
+    # --- Benchmark the Threaded Method (Vectorization on Every Core) ---
+    print(f"\n[Threaded Method] Using Vectorization on {os.cpu_count()} Threads:")
+    start_time_threaded = time.perf_counter()
+    grayscale_threaded = convert_to_grayscale_threaded(color_image)
+    end_time_threaded = time.perf_counter()
+    time_threaded = end_time_threaded - start_time_threaded
+    print(f"Time taken: {time_threaded:.4f} seconds.")
+    cv2.imwrite("grayscale_threaded.jpg", grayscale_threaded)
+
+    # --- Benchmark the Tiled Method (Cache Blocking) ---
+    print("\n[Tiled Method] Using Cache-Sized Tiles:")
+    start_time_tiled = time.perf_counter()
+    grayscale_tiled = convert_to_grayscale_tiled(color_image)
+    end_time_tiled = time.perf_counter()
+    time_tiled = end_time_tiled - start_time_tiled
+    print(f"Time taken: {time_tiled:.4f} seconds.")
+    cv2.imwrite("grayscale_tiled.jpg", grayscale_tiled)
+
+    # --- Benchmark the GPU Method (CuPy) ---
+    if cp is not None:
+        print("\n[GPU Method] Using CuPy (including transfers):")
+        # Run once first, so CUDA initialization and kernel compilation are
+        # not counted in the benchmark.
+        convert_to_grayscale_cuda(color_image[:1])
+        start_time_cuda = time.perf_counter()
+        grayscale_cuda = convert_to_grayscale_cuda(color_image)
+        end_time_cuda = time.perf_counter()
+        time_cuda = end_time_cuda - start_time_cuda
+        print(f"Time taken: {time_cuda:.4f} seconds.")
+        cv2.imwrite("grayscale_cuda.jpg", grayscale_cuda)
+
+    # --- Benchmark Decoding Straight to Grayscale ---
+    # All methods above start from a decoded color image, to compare them fairly.
+    # When the goal is just a grayscale image, production code should instead ask
+    # the JPEG decoder for one: it skips the color reconstruction and never
+    # allocates the 3-channel buffer at all.
+    print("\n[Decoder Method] Reading the Image Directly as Grayscale:")
+    start_time_native = time.perf_counter()
+    grayscale_native = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    end_time_native = time.perf_counter()
+    time_native = end_time_native - start_time_native
+    print(f"Time taken: {time_native:.4f} seconds "
+          f"(vs. {time_decode + time_vec:.4f} seconds to read in color and vectorize).")
+    cv2.imwrite("grayscale_decoder.jpg", grayscale_native)
+
     # --- Final Comparison ---
     # Calculate the performance improvement factor.
     if time_vec > 0:
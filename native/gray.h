@@ -0,0 +1,52 @@
+/*
+ * FILENAME: gray.h
+ *
+ * DESCRIPTION:
+ * Shared constants and kernel declarations for the native grayscale library.
+ * Every instruction set gets its own source file, compiled with only that
+ * instruction set enabled; gray_dispatch.c picks the best one for the CPU
+ * the library is loaded on.
+ */
+
+#ifndef GRAY_H
+#define GRAY_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+/*
+ * The VPMADDUBSW-based kernels need weights that fit in a *signed* byte, so
+ * they use 1.7 fixed point (x128) rather than the 8.8 format of METHOD 2:
+ *     0.114 * 128 ~= 15,  0.587 * 128 ~= 75,  0.299 * 128 ~= 38
+ * They sum to 128, so 255 * 128 = 32640 fits an int16 without saturating.
+ */
+#define COEFF_B 15
+#define COEFF_G 75
+#define COEFF_R 38
+
+/*
+ * The 8.8 fixed-point weights of the NumPy method, for the exact kernels:
+ *     0.114 * 256 ~= 29,  0.587 * 256 ~= 150,  0.299 * 256 ~= 77
+ * They sum to 256, so pure white stays at 255.
+ */
+#define Q8_COEFF_B 29
+#define Q8_COEFF_G 150
+#define Q8_COEFF_R 77
+
+#define Z -1 /* Shuffle index with the high bit set: writes a zero byte. */
+
+/* All kernels take tightly packed pixels and write one byte per pixel. */
+typedef void (*gray_kernel)(const uint8_t *src, uint8_t *dst, size_t n_pixels);
+
+void bgr2gray_sse42(const uint8_t *src, uint8_t *dst, size_t n_pixels);
+void bgra2gray_sse42(const uint8_t *src, uint8_t *dst, size_t n_pixels);
+
+void bgr2gray_avx2(const uint8_t *src, uint8_t *dst, size_t n_pixels);
+void bgra2gray_avx2(const uint8_t *src, uint8_t *dst, size_t n_pixels);
+void bgr2gray_avx2_q8(const uint8_t *src, uint8_t *dst, size_t n_pixels);
+void bgra2gray_avx2_q8(const uint8_t *src, uint8_t *dst, size_t n_pixels);
+
+void bgr2gray_avx512(const uint8_t *src, uint8_t *dst, size_t n_pixels);
+void bgra2gray_avx512(const uint8_t *src, uint8_t *dst, size_t n_pixels);
+
+#endif /* GRAY_H */
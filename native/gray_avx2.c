@@ -0,0 +1,224 @@
+/*
+ * FILENAME: gray_avx2.c
+ *
+ * DESCRIPTION:
+ * Hand-written AVX2 kernels for the BGR -> grayscale conversion, used by
+ * METHOD 5 in image_converter.py through the dispatcher in gray_dispatch.c.
+ *
+ * The core instruction is VPMADDUBSW (_mm256_maddubs_epi16): it multiplies
+ * unsigned 8-bit pixels by signed 8-bit weights and adds neighbouring pairs
+ * into 16-bit sums. Feeding it (B, G) pairs and (R, 0) pairs gives the whole
+ * weighted sum for 16 pixels in two instructions. The weights are the 1.7
+ * fixed-point ones described in gray.h. They are coarser than the 8.8 weights
+ * of the NumPy method, so on random input about a third of the pixels come
+ * out one gray level above or below it.
+ *
+ * BGRA images have their own kernel, bgra2gray_avx2, which needs no shuffles
+ * at all: giving the alpha byte a weight of 0 drops it inside the multiply.
+ *
+ * The *_q8 kernels are the exact variants: they widen the pixels to 16 bits
+ * and use VPMADDWD (_mm256_madd_epi16), the x86 counterpart of WebAssembly's
+ * i32x4.dot_i16x8_s, whose 16-bit weights fit the same 8.8 values as METHOD 2.
+ * They are a little slower, but give the same value as the NumPy method for
+ * every pixel.
+ */
+
+#include <immintrin.h>
+
+#include "gray.h"
+
+/*
+ * Deinterleaves 16 BGR pixels (48 bytes) into (B, G) byte pairs and (R, 0)
+ * byte pairs: pixels 0-7 in the low 128-bit lane, pixels 8-15 in the high lane.
+ */
+static inline void deinterleave16(const uint8_t *src, __m256i *bg, __m256i *r)
+{
+    /* _mm256_shuffle_epi8 cannot move bytes across 128-bit lanes, so each lane
+     * gets its own 8 pixels (24 bytes). Those do not fit in one 16-byte lane,
+     * so they are read as two overlapping halves: bytes 0-15 and bytes 8-23. */
+    const __m256i lo = _mm256_loadu2_m128i((const __m128i *)(src + 24),
+                                           (const __m128i *)(src + 0));
+    const __m256i hi = _mm256_loadu2_m128i((const __m128i *)(src + 32),
+                                           (const __m128i *)(src + 8));
+
+    /* Gather (B, G) pairs for pixels 0-4 from `lo` and 5-7 from `hi`. */
+    const __m256i bg_lo = _mm256_setr_epi8(
+        0, 1, 3, 4, 6, 7, 9, 10, 12, 13, Z, Z, Z, Z, Z, Z,
+        0, 1, 3, 4, 6, 7, 9, 10, 12, 13, Z, Z, Z, Z, Z, Z);
+    const __m256i bg_hi = _mm256_setr_epi8(
+        Z, Z, Z, Z, Z, Z, Z, Z, Z, Z, 7, 8, 10, 11, 13, 14,
+        Z, Z, Z, Z, Z, Z, Z, Z, Z, Z, 7, 8, 10, 11, 13, 14);
+    /* Gather (R, 0) pairs the same way. */
+    const __m256i r_lo = _mm256_setr_epi8(
+        2, Z, 5, Z, 8, Z, 11, Z, 14, Z, Z, Z, Z, Z, Z, Z,
+        2, Z, 5, Z, 8, Z, 11, Z, 14, Z, Z, Z, Z, Z, Z, Z);
+    const __m256i r_hi = _mm256_setr_epi8(
+        Z, Z, Z, Z, Z, Z, Z, Z, Z, Z, 9, Z, 12, Z, 15, Z,
+        Z, Z, Z, Z, Z, Z, Z, Z, Z, Z, 9, Z, 12, Z, 15, Z);
+
+    *bg = _mm256_or_si256(_mm256_shuffle_epi8(lo, bg_lo),
+                          _mm256_shuffle_epi8(hi, bg_hi));
+    *r = _mm256_or_si256(_mm256_shuffle_epi8(lo, r_lo),
+                         _mm256_shuffle_epi8(hi, r_hi));
+}
+
+/*
+ * Converts 16 BGR pixels (48 bytes) to sixteen 16-bit gray values with
+ * VPMADDUBSW, in the same lane layout as deinterleave16.
+ */
+static inline __m256i gray16(const uint8_t *src)
+{
+    __m256i bg, r;
+    deinterleave16(src, &bg, &r);
+
+    /* B*cB + G*cG and R*cR + 0*0, each as sixteen int16 sums. */
+    const __m256i coeff_bg = _mm256_set1_epi16((COEFF_G << 8) | COEFF_B);
+    const __m256i coeff_r = _mm256_set1_epi16(COEFF_R);
+    const __m256i sum = _mm256_add_epi16(_mm256_maddubs_epi16(bg, coeff_bg),
+                                         _mm256_maddubs_epi16(r, coeff_r));
+
+    /* Divide by 128 to undo the fixed-point scaling. */
+    return _mm256_srli_epi16(sum, 7);
+}
+
+/*
+ * Same as gray16, but with VPMADDWD (_mm256_madd_epi16) on pixels widened to
+ * 16 bits. Its weights are 16-bit too, so the exact 8.8 weights of METHOD 2
+ * fit, and the results match the NumPy method bit for bit.
+ */
+static inline __m256i gray16_q8(const uint8_t *src)
+{
+    __m256i bg, r;
+    deinterleave16(src, &bg, &r);
+
+    const __m256i zero = _mm256_setzero_si256();
+    const __m256i coeff_bg = _mm256_set1_epi32((Q8_COEFF_G << 16) | Q8_COEFF_B);
+    const __m256i coeff_r = _mm256_set1_epi32(Q8_COEFF_R);
+
+    /* Widen the (B, G) byte pairs to int16 pairs; each half holds 4 pixels
+     * per lane, and VPMADDWD turns every pair into one int32 B*cB + G*cG. */
+    const __m256i bg_first = _mm256_madd_epi16(_mm256_unpacklo_epi8(bg, zero), coeff_bg);
+    const __m256i bg_second = _mm256_madd_epi16(_mm256_unpackhi_epi8(bg, zero), coeff_bg);
+    /* The (R, 0) byte pairs are already int16 values; widening them again
+     * gives (R, 0) int16 pairs, which VPMADDWD turns into int32 R*cR. */
+    const __m256i r_first = _mm256_madd_epi16(_mm256_unpacklo_epi16(r, zero), coeff_r);
+    const __m256i r_second = _mm256_madd_epi16(_mm256_unpackhi_epi16(r, zero), coeff_r);
+
+    /* Divide by 256 and narrow back to sixteen int16 values (lane layout as
+     * in gray16: packus places the two halves of each lane side by side). */
+    const __m256i first = _mm256_srli_epi32(_mm256_add_epi32(bg_first, r_first), 8);
+    const __m256i second = _mm256_srli_epi32(_mm256_add_epi32(bg_second, r_second), 8);
+    return _mm256_packus_epi32(first, second);
+}
+
+void bgr2gray_avx2(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    size_t i = 0;
+
+    /* Main loop: 32 pixels (96 bytes in, 32 bytes out) per iteration. */
+    for (; i + 32 <= n_pixels; i += 32) {
+        const __m256i first = gray16(src + 3 * i);
+        const __m256i second = gray16(src + 3 * i + 48);
+
+        /* packus works per lane, giving pixels [0-7, 16-23, 8-15, 24-31];
+         * the permute puts the four 8-byte groups back in order. */
+        const __m256i packed = _mm256_packus_epi16(first, second);
+        _mm256_storeu_si256((__m256i *)(dst + i),
+                            _mm256_permute4x64_epi64(packed, 0xD8));
+    }
+
+    /* Scalar tail for the last few pixels, using the same formula. */
+    for (; i < n_pixels; i++) {
+        const uint8_t *p = src + 3 * i;
+        dst[i] = (uint8_t)((COEFF_B * p[0] + COEFF_G * p[1] + COEFF_R * p[2]) >> 7);
+    }
+}
+
+void bgra2gray_avx2(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    /* Every pixel is 4 bytes, so VPMADDUBSW with the weights (cB, cG, cR, 0)
+     * directly gives two int16 terms per pixel: B*cB + G*cG and R*cR + A*0. */
+    const __m256i coeffs = _mm256_set1_epi32((COEFF_R << 16) | (COEFF_G << 8) | COEFF_B);
+    /* packus and hadd work per lane, so the 4-pixel groups come out in the
+     * order [0, 2, 4, 6 | 1, 3, 5, 7]; this permutation restores them. */
+    const __m256i order = _mm256_setr_epi32(0, 4, 1, 5, 2, 6, 3, 7);
+    size_t i = 0;
+
+    /* Main loop: 32 pixels (128 bytes in, 32 bytes out) per iteration. */
+    for (; i + 32 <= n_pixels; i += 32) {
+        const uint8_t *p = src + 4 * i;
+        const __m256i a = _mm256_maddubs_epi16(_mm256_loadu_si256((const __m256i *)(p + 0)), coeffs);
+        const __m256i b = _mm256_maddubs_epi16(_mm256_loadu_si256((const __m256i *)(p + 32)), coeffs);
+        const __m256i c = _mm256_maddubs_epi16(_mm256_loadu_si256((const __m256i *)(p + 64)), coeffs);
+        const __m256i d = _mm256_maddubs_epi16(_mm256_loadu_si256((const __m256i *)(p + 96)), coeffs);
+
+        /* Adding each pixel's two terms gives sixteen gray values per vector. */
+        const __m256i first = _mm256_srli_epi16(_mm256_hadd_epi16(a, b), 7);
+        const __m256i second = _mm256_srli_epi16(_mm256_hadd_epi16(c, d), 7);
+
+        const __m256i packed = _mm256_packus_epi16(first, second);
+        _mm256_storeu_si256((__m256i *)(dst + i),
+                            _mm256_permutevar8x32_epi32(packed, order));
+    }
+
+    /* Scalar tail for the last few pixels, using the same formula. */
+    for (; i < n_pixels; i++) {
+        const uint8_t *p = src + 4 * i;
+        dst[i] = (uint8_t)((COEFF_B * p[0] + COEFF_G * p[1] + COEFF_R * p[2]) >> 7);
+    }
+}
+
+void bgr2gray_avx2_q8(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    size_t i = 0;
+
+    /* Main loop: 32 pixels (96 bytes in, 32 bytes out) per iteration. */
+    for (; i + 32 <= n_pixels; i += 32) {
+        const __m256i first = gray16_q8(src + 3 * i);
+        const __m256i second = gray16_q8(src + 3 * i + 48);
+        const __m256i packed = _mm256_packus_epi16(first, second);
+        _mm256_storeu_si256((__m256i *)(dst + i),
+                            _mm256_permute4x64_epi64(packed, 0xD8));
+    }
+
+    /* Scalar tail for the last few pixels, using the same formula. */
+    for (; i < n_pixels; i++) {
+        const uint8_t *p = src + 3 * i;
+        dst[i] = (uint8_t)((Q8_COEFF_B * p[0] + Q8_COEFF_G * p[1] + Q8_COEFF_R * p[2]) >> 8);
+    }
+}
+
+void bgra2gray_avx2_q8(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    /* Widened to int16, every pixel is (B, G, R, A); VPMADDWD with the weights
+     * (cB, cG, cR, 0) gives two int32 terms per pixel, which VPHADDD adds. */
+    const __m256i coeffs = _mm256_set1_epi64x(
+        ((int64_t)Q8_COEFF_R << 32) | (Q8_COEFF_G << 16) | Q8_COEFF_B);
+    const __m256i zero = _mm256_setzero_si256();
+    const __m256i order = _mm256_setr_epi32(0, 4, 1, 5, 2, 6, 3, 7);
+    __m256i gray[4];
+    size_t i = 0;
+
+    /* Main loop: 32 pixels (128 bytes in, 32 bytes out) per iteration. */
+    for (; i + 32 <= n_pixels; i += 32) {
+        for (int k = 0; k < 4; k++) {
+            const __m256i px = _mm256_loadu_si256((const __m256i *)(src + 4 * i + 32 * k));
+            const __m256i first = _mm256_madd_epi16(_mm256_unpacklo_epi8(px, zero), coeffs);
+            const __m256i second = _mm256_madd_epi16(_mm256_unpackhi_epi8(px, zero), coeffs);
+            /* Eight int32 gray values, for pixels 8k to 8k + 7 in order. */
+            gray[k] = _mm256_srli_epi32(_mm256_hadd_epi32(first, second), 8);
+        }
+
+        /* The same lane juggling as in bgra2gray_avx2 puts them back in order. */
+        const __m256i packed = _mm256_packus_epi16(_mm256_packus_epi32(gray[0], gray[1]),
+                                                   _mm256_packus_epi32(gray[2], gray[3]));
+        _mm256_storeu_si256((__m256i *)(dst + i),
+                            _mm256_permutevar8x32_epi32(packed, order));
+    }
+
+    /* Scalar tail for the last few pixels, using the same formula. */
+    for (; i < n_pixels; i++) {
+        const uint8_t *p = src + 4 * i;
+        dst[i] = (uint8_t)((Q8_COEFF_B * p[0] + Q8_COEFF_G * p[1] + Q8_COEFF_R * p[2]) >> 8);
+    }
+}
@@ -0,0 +1,89 @@
+/*
+ * FILENAME: gray_avx512.c
+ *
+ * DESCRIPTION:
+ * The 512-bit versions of the AVX2 kernels in gray_avx2.c, for CPUs with
+ * AVX-512BW (Skylake-X, Ice Lake, Zen 4 and later). Twice as many pixels
+ * fit in a register, and the VPMOVWB/VPMOVDB narrowing instructions write
+ * the results back in pixel order without any packing and permuting.
+ */
+
+#include <immintrin.h>
+
+#include "gray.h"
+
+/*
+ * Converts 32 BGR pixels (96 bytes) to thirty-two 16-bit gray values in
+ * pixel order: 128-bit lane k holds pixels 8k to 8k + 7.
+ */
+static inline __m512i gray32(const uint8_t *src)
+{
+    /* As in gray_avx2.c, every 128-bit lane gets its own 8 pixels (24 bytes),
+     * read as two overlapping halves: bytes 0-15 and bytes 8-23. */
+    __m512i lo = _mm512_castsi128_si512(_mm_loadu_si128((const __m128i *)(src + 0)));
+    __m512i hi = _mm512_castsi128_si512(_mm_loadu_si128((const __m128i *)(src + 8)));
+    lo = _mm512_inserti32x4(lo, _mm_loadu_si128((const __m128i *)(src + 24)), 1);
+    hi = _mm512_inserti32x4(hi, _mm_loadu_si128((const __m128i *)(src + 32)), 1);
+    lo = _mm512_inserti32x4(lo, _mm_loadu_si128((const __m128i *)(src + 48)), 2);
+    hi = _mm512_inserti32x4(hi, _mm_loadu_si128((const __m128i *)(src + 56)), 2);
+    lo = _mm512_inserti32x4(lo, _mm_loadu_si128((const __m128i *)(src + 72)), 3);
+    hi = _mm512_inserti32x4(hi, _mm_loadu_si128((const __m128i *)(src + 80)), 3);
+
+    /* Gather (B, G) pairs and (R, 0) pairs with the same per-lane masks. */
+    const __m512i bg_lo = _mm512_broadcast_i32x4(
+        _mm_setr_epi8(0, 1, 3, 4, 6, 7, 9, 10, 12, 13, Z, Z, Z, Z, Z, Z));
+    const __m512i bg_hi = _mm512_broadcast_i32x4(
+        _mm_setr_epi8(Z, Z, Z, Z, Z, Z, Z, Z, Z, Z, 7, 8, 10, 11, 13, 14));
+    const __m512i r_lo = _mm512_broadcast_i32x4(
+        _mm_setr_epi8(2, Z, 5, Z, 8, Z, 11, Z, 14, Z, Z, Z, Z, Z, Z, Z));
+    const __m512i r_hi = _mm512_broadcast_i32x4(
+        _mm_setr_epi8(Z, Z, Z, Z, Z, Z, Z, Z, Z, Z, 9, Z, 12, Z, 15, Z));
+
+    const __m512i bg = _mm512_or_si512(_mm512_shuffle_epi8(lo, bg_lo),
+                                       _mm512_shuffle_epi8(hi, bg_hi));
+    const __m512i r = _mm512_or_si512(_mm512_shuffle_epi8(lo, r_lo),
+                                      _mm512_shuffle_epi8(hi, r_hi));
+
+    const __m512i sum = _mm512_add_epi16(
+        _mm512_maddubs_epi16(bg, _mm512_set1_epi16((COEFF_G << 8) | COEFF_B)),
+        _mm512_maddubs_epi16(r, _mm512_set1_epi16(COEFF_R)));
+    return _mm512_srli_epi16(sum, 7);
+}
+
+void bgr2gray_avx512(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    size_t i = 0;
+
+    /* Main loop: 32 pixels (96 bytes in, 32 bytes out) per iteration. */
+    for (; i + 32 <= n_pixels; i += 32) {
+        _mm256_storeu_si256((__m256i *)(dst + i), _mm512_cvtepi16_epi8(gray32(src + 3 * i)));
+    }
+
+    /* Scalar tail for the last few pixels, using the same formula. */
+    for (; i < n_pixels; i++) {
+        const uint8_t *p = src + 3 * i;
+        dst[i] = (uint8_t)((COEFF_B * p[0] + COEFF_G * p[1] + COEFF_R * p[2]) >> 7);
+    }
+}
+
+void bgra2gray_avx512(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    const __m512i coeffs = _mm512_set1_epi32((COEFF_R << 16) | (COEFF_G << 8) | COEFF_B);
+    const __m512i ones = _mm512_set1_epi16(1);
+    size_t i = 0;
+
+    /* Main loop: 16 pixels (64 bytes in, 16 bytes out) per iteration. */
+    for (; i + 16 <= n_pixels; i += 16) {
+        /* VPMADDUBSW gives each pixel's two terms, and VPMADDWD with weights
+         * of 1 adds them up (AVX-512 has no horizontal add). */
+        const __m512i px = _mm512_loadu_si512((const void *)(src + 4 * i));
+        const __m512i sum = _mm512_madd_epi16(_mm512_maddubs_epi16(px, coeffs), ones);
+        _mm_storeu_si128((__m128i *)(dst + i), _mm512_cvtepi32_epi8(_mm512_srli_epi32(sum, 7)));
+    }
+
+    /* Scalar tail for the last few pixels, using the same formula. */
+    for (; i < n_pixels; i++) {
+        const uint8_t *p = src + 4 * i;
+        dst[i] = (uint8_t)((COEFF_B * p[0] + COEFF_G * p[1] + COEFF_R * p[2]) >> 7);
+    }
+}
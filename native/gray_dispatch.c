@@ -0,0 +1,134 @@
+/*
+ * FILENAME: gray_dispatch.c
+ *
+ * DESCRIPTION:
+ * The public entry points of the native grayscale library, called from
+ * METHOD 5 in image_converter.py through ctypes.
+ *
+ * Compiling everything with -mavx512bw would make the library crash with an
+ * "illegal instruction" on any CPU without AVX-512. Instead, every
+ * instruction set lives in its own source file, and this file - compiled for
+ * the baseline x86-64 CPU - checks once, when the library is loaded, which
+ * kernels the CPU supports and points the entry points at the fastest ones.
+ *
+ * Setting the environment variable GRAY_ISA to "avx512", "avx2", "sse4.2" or
+ * "scalar" (in any case) caps the choice, e.g. to compare the kernels on one
+ * machine. An empty or unrecognised value caps nothing.
+ */
+
+#include <stdlib.h>
+#include <strings.h>
+
+#include "gray.h"
+
+/* --- Portable fallbacks, for CPUs without SSE4.2 --- */
+
+static void bgr2gray_scalar(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    for (size_t i = 0; i < n_pixels; i++, src += 3)
+        dst[i] = (uint8_t)((COEFF_B * src[0] + COEFF_G * src[1] + COEFF_R * src[2]) >> 7);
+}
+
+static void bgra2gray_scalar(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    for (size_t i = 0; i < n_pixels; i++, src += 4)
+        dst[i] = (uint8_t)((COEFF_B * src[0] + COEFF_G * src[1] + COEFF_R * src[2]) >> 7);
+}
+
+static void bgr2gray_scalar_q8(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    for (size_t i = 0; i < n_pixels; i++, src += 3)
+        dst[i] = (uint8_t)((Q8_COEFF_B * src[0] + Q8_COEFF_G * src[1] + Q8_COEFF_R * src[2]) >> 8);
+}
+
+static void bgra2gray_scalar_q8(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    for (size_t i = 0; i < n_pixels; i++, src += 4)
+        dst[i] = (uint8_t)((Q8_COEFF_B * src[0] + Q8_COEFF_G * src[1] + Q8_COEFF_R * src[2]) >> 8);
+}
+
+/* --- Runtime dispatch --- */
+
+static gray_kernel bgr2gray_impl = bgr2gray_scalar;
+static gray_kernel bgra2gray_impl = bgra2gray_scalar;
+static gray_kernel bgr2gray_q8_impl = bgr2gray_scalar_q8;
+static gray_kernel bgra2gray_q8_impl = bgra2gray_scalar_q8;
+static const char *isa_name = "scalar";
+
+enum isa_level { ISA_SCALAR, ISA_SSE42, ISA_AVX2, ISA_AVX512 };
+
+/* Maps a GRAY_ISA value to the highest level it allows. */
+static enum isa_level parse_isa_cap(const char *cap)
+{
+    static const struct { const char *name; enum isa_level level; } names[] = {
+        {"scalar", ISA_SCALAR},
+        {"sse4.2", ISA_SSE42}, {"sse42", ISA_SSE42},
+        {"avx2", ISA_AVX2},
+        {"avx512", ISA_AVX512}, {"avx-512", ISA_AVX512}, {"avx512bw", ISA_AVX512},
+    };
+
+    if (cap != NULL)
+        for (size_t i = 0; i < sizeof(names) / sizeof(names[0]); i++)
+            if (strcasecmp(cap, names[i].name) == 0)
+                return names[i].level;
+    /* Unset or unknown: a typo must not silently fall back to scalar code. */
+    return ISA_AVX512;
+}
+
+__attribute__((constructor))
+static void select_kernels(void)
+{
+    const enum isa_level cap = parse_isa_cap(getenv("GRAY_ISA"));
+    const int allow_avx512 = cap >= ISA_AVX512;
+    const int allow_avx2 = cap >= ISA_AVX2;
+    const int allow_sse42 = cap >= ISA_SSE42;
+
+    __builtin_cpu_init();
+
+    /* The exact kernels only exist for AVX2, which every AVX-512 CPU has. */
+    if (allow_sse42 && __builtin_cpu_supports("sse4.2")) {
+        bgr2gray_impl = bgr2gray_sse42;
+        bgra2gray_impl = bgra2gray_sse42;
+        isa_name = "SSE4.2";
+    }
+    if (allow_avx2 && __builtin_cpu_supports("avx2")) {
+        bgr2gray_impl = bgr2gray_avx2;
+        bgra2gray_impl = bgra2gray_avx2;
+        bgr2gray_q8_impl = bgr2gray_avx2_q8;
+        bgra2gray_q8_impl = bgra2gray_avx2_q8;
+        isa_name = "AVX2";
+    }
+    if (allow_avx512 && __builtin_cpu_supports("avx512bw")) {
+        bgr2gray_impl = bgr2gray_avx512;
+        bgra2gray_impl = bgra2gray_avx512;
+        isa_name = "AVX-512";
+    }
+}
+
+/* --- Public entry points --- */
+
+void bgr2gray(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    bgr2gray_impl(src, dst, n_pixels);
+}
+
+void bgra2gray(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    bgra2gray_impl(src, dst, n_pixels);
+}
+
+void bgr2gray_q8(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    bgr2gray_q8_impl(src, dst, n_pixels);
+}
+
+void bgra2gray_q8(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    bgra2gray_q8_impl(src, dst, n_pixels);
+}
+
+/* The name of the instruction set that bgr2gray and bgra2gray run on. */
+const char *gray_isa(void)
+{
+    return isa_name;
+}
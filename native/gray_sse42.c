@@ -0,0 +1,78 @@
+/*
+ * FILENAME: gray_sse42.c
+ *
+ * DESCRIPTION:
+ * The 128-bit versions of the AVX2 kernels in gray_avx2.c, for CPUs from
+ * before AVX2 (roughly 2008-2013). They only need SSSE3 instructions, which
+ * every SSE4.2 CPU has. Being just 128 bits wide, they need none of the lane
+ * juggling of the 256-bit kernels.
+ */
+
+#include <immintrin.h>
+
+#include "gray.h"
+
+/* Converts 8 BGR pixels (24 bytes) to eight 16-bit gray values. */
+static inline __m128i gray8(const uint8_t *src)
+{
+    /* The 24 bytes do not fit in one register, so they are read as two
+     * overlapping halves: bytes 0-15 and bytes 8-23. */
+    const __m128i lo = _mm_loadu_si128((const __m128i *)(src + 0));
+    const __m128i hi = _mm_loadu_si128((const __m128i *)(src + 8));
+
+    /* Gather (B, G) pairs and (R, 0) pairs, as in gray_avx2.c. */
+    const __m128i bg = _mm_or_si128(
+        _mm_shuffle_epi8(lo, _mm_setr_epi8(0, 1, 3, 4, 6, 7, 9, 10, 12, 13, Z, Z, Z, Z, Z, Z)),
+        _mm_shuffle_epi8(hi, _mm_setr_epi8(Z, Z, Z, Z, Z, Z, Z, Z, Z, Z, 7, 8, 10, 11, 13, 14)));
+    const __m128i r = _mm_or_si128(
+        _mm_shuffle_epi8(lo, _mm_setr_epi8(2, Z, 5, Z, 8, Z, 11, Z, 14, Z, Z, Z, Z, Z, Z, Z)),
+        _mm_shuffle_epi8(hi, _mm_setr_epi8(Z, Z, Z, Z, Z, Z, Z, Z, Z, Z, 9, Z, 12, Z, 15, Z)));
+
+    const __m128i sum = _mm_add_epi16(
+        _mm_maddubs_epi16(bg, _mm_set1_epi16((COEFF_G << 8) | COEFF_B)),
+        _mm_maddubs_epi16(r, _mm_set1_epi16(COEFF_R)));
+    return _mm_srli_epi16(sum, 7);
+}
+
+void bgr2gray_sse42(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    size_t i = 0;
+
+    /* Main loop: 16 pixels (48 bytes in, 16 bytes out) per iteration. */
+    for (; i + 16 <= n_pixels; i += 16) {
+        const __m128i packed = _mm_packus_epi16(gray8(src + 3 * i), gray8(src + 3 * i + 24));
+        _mm_storeu_si128((__m128i *)(dst + i), packed);
+    }
+
+    /* Scalar tail for the last few pixels, using the same formula. */
+    for (; i < n_pixels; i++) {
+        const uint8_t *p = src + 3 * i;
+        dst[i] = (uint8_t)((COEFF_B * p[0] + COEFF_G * p[1] + COEFF_R * p[2]) >> 7);
+    }
+}
+
+void bgra2gray_sse42(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    const __m128i coeffs = _mm_set1_epi32((COEFF_R << 16) | (COEFF_G << 8) | COEFF_B);
+    size_t i = 0;
+
+    /* Main loop: 16 pixels (64 bytes in, 16 bytes out) per iteration. */
+    for (; i + 16 <= n_pixels; i += 16) {
+        const uint8_t *p = src + 4 * i;
+        const __m128i a = _mm_maddubs_epi16(_mm_loadu_si128((const __m128i *)(p + 0)), coeffs);
+        const __m128i b = _mm_maddubs_epi16(_mm_loadu_si128((const __m128i *)(p + 16)), coeffs);
+        const __m128i c = _mm_maddubs_epi16(_mm_loadu_si128((const __m128i *)(p + 32)), coeffs);
+        const __m128i d = _mm_maddubs_epi16(_mm_loadu_si128((const __m128i *)(p + 48)), coeffs);
+
+        /* Adding each pixel's two terms gives eight gray values, in order. */
+        const __m128i first = _mm_srli_epi16(_mm_hadd_epi16(a, b), 7);
+        const __m128i second = _mm_srli_epi16(_mm_hadd_epi16(c, d), 7);
+        _mm_storeu_si128((__m128i *)(dst + i), _mm_packus_epi16(first, second));
+    }
+
+    /* Scalar tail for the last few pixels, using the same formula. */
+    for (; i < n_pixels; i++) {
+        const uint8_t *p = src + 4 * i;
+        dst[i] = (uint8_t)((COEFF_B * p[0] + COEFF_G * p[1] + COEFF_R * p[2]) >> 7);
+    }
+}